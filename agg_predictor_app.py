@@ -440,8 +440,9 @@ elif page == "Analyse économétrique":
                 reconstructed.append(current_level)
             return reconstructed
             
-        last_pib_level = df_full['PIB'].iloc[-1]
-        last_year = df_full.index[-1]
+        # Le VAR part de la dernière année de df_growth : le niveau de départ doit être celui de cette année
+        last_year = bundle.get('last_year', df_growth.index[-1])
+        last_pib_level = df_full.loc[last_year, 'PIB']
         future_index = pd.RangeIndex(start=last_year + 1, stop=last_year + 1 + n_forecast)
         final_preds = pd.DataFrame(index=future_index, columns=['PIB prédit', 'PIB_Lower_CI', 'PIB_Upper_CI'])
         final_preds.index.name = 'Annee'
@@ -561,4 +562,47 @@ elif page == "Analyse économétrique":
                 else:
                     st.error("Le test a échoué (p-value < 0.05), les résidus sont hétéroscédastiques.")
             else:
-                st.info("Le test de White n'a pas pu être calculé en raison de la petite taille de l'échantillon.")
\ No newline at end of file
+                st.info("Le test de White n'a pas pu être calculé en raison de la petite taille de l'échantillon.")
+        influence = bundle.get('influence')  # Absent des bundles générés avant l'analyse d'influence
+        if influence is not None:
+            st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
+
+            st.markdown("""
+            <div class="teal-box">
+                <div class="section-title">Analyse d'influence des années (Jackknife)</div>
+                <p>Le modèle VAR est réestimé en excluant successivement chaque année (et des blocs d'années consécutives). Une année exclue est retirée à la fois comme observation cible et comme valeur retardée dans les équations des {p_note} années suivantes, afin de mesurer toute son influence. Les années dont l'exclusion modifie le plus le PIB prédit à {horizon} ans sont celles qui pèsent le plus sur les prévisions.</p>
+            </div>
+            """.format(horizon=influence['horizon'], p_note=model_fit.k_ar), unsafe_allow_html=True)
+
+            influence_df = influence['table']
+            block_size = st.selectbox(
+                "Taille des blocs exclus (en années) :",
+                influence['block_sizes']
+            )
+            top_influence = influence_df[influence_df['Taille du bloc'] == block_size].head(10)
+
+            fig, ax = plt.subplots(figsize=(12, 6))
+            bar_colors = ['#FF6347' if v < 0 else '#2E8B57' for v in top_influence['Variation du PIB prédit (%)']]
+            ax.barh(top_influence['Années exclues'], top_influence['Variation du PIB prédit (%)'], color=bar_colors)
+            ax.invert_yaxis()
+            ax.axvline(0, color='#cccccc', linewidth=1)
+
+            ax.set_title(f"Années les plus influentes sur le PIB prédit à {influence['horizon']} ans", fontsize=16, fontweight='bold', pad=20)
+            ax.set_xlabel("Variation du PIB prédit (%)", fontsize=12, fontweight='bold')
+            ax.set_ylabel("Années exclues", fontsize=12, fontweight='bold')
+            ax.grid(True, axis='x', linestyle=':', alpha=0.7)
+
+            # Amélioration esthétique
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            ax.spines['left'].set_color('#cccccc')
+            ax.spines['bottom'].set_color('#cccccc')
+
+            st.pyplot(fig)
+
+            st.dataframe(top_influence.set_index('Années exclues').style.format({
+                'Variation des coefficients': "{:.3f}",
+                'Variation relative des coefficients (%)': "{:.1f} %",
+                f"PIB prédit à {influence['horizon']} ans": "{:,.0f} $",
+                'Variation du PIB prédit (%)': "{:+.2f} %"
+            }))
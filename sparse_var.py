@@ -0,0 +1,246 @@
+# ==============================================================================
+# ESTIMATEUR VAR RÉGULARISÉ (ELASTIC-NET) POUR UN GRAND NOMBRE DE SÉRIES WDI
+# ==============================================================================
+# Un VAR non contraint avec p retards et k séries estime 1 + k*p coefficients par
+# équation : sur ~30 observations annuelles, il n'y a plus de degrés de liberté
+# dès que k dépasse 3 ou 4. Cet estimateur pénalise les coefficients (elastic-net)
+# pour permettre 20 à 50 séries, et expose la même interface de prévision que les
+# résultats VAR de statsmodels (k_ar, params, forecast, forecast_interval).
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.stats import norm
+from sklearn.linear_model import ElasticNet, enet_path
+
+# Sur ~30 observations les régresseurs sont très corrélés : la descente de coordonnées a
+# besoin de bien plus que les 1000 itérations par défaut de scikit-learn pour converger.
+MAX_ITER = 10_000
+
+
+def build_lagged_design(values, p):
+    """Construit la matrice des retards [y(t-1), ..., y(t-p)] et la cible y(t)."""
+    values = np.asarray(values, dtype=float)
+    Z = np.hstack([values[p - lag:len(values) - lag] for lag in range(1, p + 1)])
+    return Z, values[p:]
+
+
+def design_scale(Z, lag_weights):
+    """Facteurs d'échelle des régresseurs : écart-type multiplié par le poids de pénalité du retard."""
+    z_std = Z.std(axis=0)
+    z_std[z_std == 0] = 1.0
+    return z_std * lag_weights
+
+
+def fit_penalty_path(Z, Y, alphas, l1_ratio, lag_weights):
+    """
+    Estime chaque équation le long du chemin de pénalités (du plus fort au plus faible).
+
+    La descente de coordonnées de `enet_path` démarre à chaud sur la solution de la
+    pénalité précédente. Diviser une colonne par son poids revient à multiplier sa
+    pénalité par ce poids : les retards lointains sont donc plus fortement pénalisés.
+    Retourne un tableau (n_alphas, 1 + k*p, k) de coefficients dans l'échelle d'origine et,
+    pour chaque équation, un booléen indiquant si tout le chemin a convergé.
+    """
+    z_mean = Z.mean(axis=0)
+    scale = design_scale(Z, lag_weights)
+    X = (Z - z_mean) / scale
+    y_mean = Y.mean(axis=0)
+
+    coefs = np.empty((alphas.shape[1], 1 + Z.shape[1], Y.shape[1]))
+    converged = np.empty(Y.shape[1], dtype=bool)
+    for j in range(Y.shape[1]):
+        _, path, _, n_iters = enet_path(X, Y[:, j] - y_mean[j], l1_ratio=l1_ratio, alphas=alphas[j],
+                                        max_iter=MAX_ITER, return_n_iter=True)
+        beta = path.T / scale
+        coefs[:, 1:, j] = beta
+        coefs[:, 0, j] = y_mean[j] - beta @ z_mean
+        converged[j] = max(n_iters) < MAX_ITER
+    return coefs, converged
+
+
+def penalty_grid(Z, Y, l1_ratio, lag_weights, n_alphas=50, eps=1e-3):
+    """Grille de pénalités décroissante par équation, de la pénalité qui annule tout à eps fois celle-ci."""
+    X = (Z - Z.mean(axis=0)) / design_scale(Z, lag_weights)
+    Yc = Y - Y.mean(axis=0)
+    alpha_max = np.abs(X.T @ Yc).max(axis=0) / (len(Y) * l1_ratio)
+    alpha_max[alpha_max == 0] = 1.0
+    return np.array([np.geomspace(a, a * eps, n_alphas) for a in alpha_max])
+
+
+def fold_errors(Z, Y, train_end, alphas, l1_ratio, lag_weights):
+    """Erreur de prévision à un pas sur l'observation `train_end`, pour chaque pénalité et chaque équation."""
+    coefs, _ = fit_penalty_path(Z[:train_end], Y[:train_end], alphas, l1_ratio, lag_weights)
+    regressors = np.concatenate([[1.0], Z[train_end]])
+    predictions = np.einsum('i,aij->aj', regressors, coefs)
+    return (predictions - Y[train_end]) ** 2
+
+
+class SparseVARResults:
+    """Résultats d'un VAR régularisé, compatibles avec l'usage qui est fait de `VARResults` dans l'application."""
+
+    def __init__(self, params, resid, sigma_u, k_ar, alphas, l1_ratio, cv_mse, exog, endog, lag_weights):
+        self.params = params
+        self.resid = resid
+        self.sigma_u = sigma_u
+        self.k_ar = k_ar
+        self.alphas = alphas
+        self.l1_ratio = l1_ratio
+        self.cv_mse = cv_mse
+        self.names = list(params.columns)
+        self.neqs = len(self.names)
+        # Matrice des régresseurs [1, Z], exposée comme `VARResults.model.exog` pour les diagnostics
+        self.model = SimpleNamespace(exog=exog, endog=endog)
+        self.lag_weights = lag_weights
+
+    @property
+    def coefs(self):
+        """Matrices de coefficients A_1, ..., A_p de forme (p, k, k), comme statsmodels."""
+        lag_coefs = self.params.values[1:]
+        return lag_coefs.reshape(self.k_ar, self.neqs, self.neqs).transpose(0, 2, 1)
+
+    @property
+    def n_nonzero(self):
+        """Nombre de coefficients de retard non nuls par équation."""
+        return (self.params.iloc[1:] != 0).sum()
+
+    def refit_excluding(self, rows):
+        """
+        Réestime chaque équation sans les lignes `rows`, aux pénalités déjà retenues (`alphas`).
+
+        La descente de coordonnées démarre à chaud sur les coefficients de l'échantillon complet,
+        avec la même mise à l'échelle des régresseurs, et converge donc en peu d'itérations.
+        Retourne un tableau (1 + k*p, k) ordonné comme `params`.
+        """
+        keep = np.setdiff1d(np.arange(len(self.model.endog)), rows)
+        Z_full = self.model.exog[:, 1:]
+        scale = design_scale(Z_full, self.lag_weights)
+        X, Y = Z_full[keep] / scale, self.model.endog[keep]
+
+        coefs = np.empty_like(self.params.values)
+        not_converged = []
+        for j, name in enumerate(self.names):
+            enet = ElasticNet(alpha=self.alphas[name], l1_ratio=self.l1_ratio, warm_start=True, max_iter=MAX_ITER)
+            enet.coef_ = self.params.values[1:, j] * scale
+            enet.fit(X, Y[:, j])
+            coefs[1:, j] = enet.coef_ / scale
+            coefs[0, j] = enet.intercept_
+            if enet.n_iter_ >= MAX_ITER:
+                not_converged.append(name)
+        if not_converged:
+            warnings.warn(f"Réestimation non convergée pour : {', '.join(not_converged)}.", RuntimeWarning)
+        return coefs
+
+    def forecast(self, y, steps):
+        """Prévision récursive à partir des `k_ar` dernières observations."""
+        history = list(np.asarray(y, dtype=float)[-self.k_ar:])
+        params = self.params.values
+        forecasts = []
+        for _ in range(steps):
+            regressors = np.concatenate([[1.0]] + [history[-lag] for lag in range(1, self.k_ar + 1)])
+            history.append(regressors @ params)
+            forecasts.append(history[-1])
+        return np.array(forecasts)
+
+    def ma_rep(self, maxn):
+        """Représentation moyenne mobile Psi_0, ..., Psi_maxn."""
+        coefs = self.coefs
+        phis = np.zeros((maxn + 1, self.neqs, self.neqs))
+        phis[0] = np.eye(self.neqs)
+        for i in range(1, maxn + 1):
+            for j in range(1, min(i, self.k_ar) + 1):
+                phis[i] += phis[i - j] @ coefs[j - 1]
+        return phis
+
+    def forecast_cov(self, steps):
+        """Matrices de covariance de l'erreur de prévision (hors incertitude sur les paramètres)."""
+        phis = self.ma_rep(steps - 1)
+        sigma_u = self.sigma_u.values
+        return np.cumsum([phi @ sigma_u @ phi.T for phi in phis], axis=0)
+
+    def forecast_interval(self, y, steps, alpha=0.05):
+        """Prévision ponctuelle et intervalle de confiance, retournés comme `VARResults.forecast_interval`."""
+        point = self.forecast(y, steps)
+        sigma = np.sqrt(np.diagonal(self.forecast_cov(steps), axis1=1, axis2=2))
+        q = norm.ppf(1 - alpha / 2)
+        return point, point - q * sigma, point + q * sigma
+
+
+def fit_sparse_var(data, maxlags=3, l1_ratio=0.5, lag_penalty=1.0, n_alphas=50, n_folds=12, n_jobs=-1,
+                   penalty_rule='min'):
+    """
+    Estime un VAR elastic-net sur les colonnes de `data`.
+
+    La pénalité de chaque équation est choisie par validation croisée temporelle : chaque
+    pli s'entraîne sur les observations antérieures et prévoit l'année suivante, sur les
+    `n_folds` dernières années (en gardant au moins la moitié de l'échantillon pour
+    l'entraînement). Par défaut (`penalty_rule='min'`) on retient la pénalité d'erreur
+    minimale. Avec `penalty_rule='1se'`, on retient la pénalité la plus forte dont l'erreur
+    reste à moins d'un écart-type de ce minimum (règle « one standard error ») : chaque pli
+    ne note qu'une observation, cet écart-type est donc large et la règle très parcimonieuse.
+    Les plis sont calculés en parallèle. Le poids de pénalité du retard l vaut l ** lag_penalty (pénalité
+    hiérarchique sur les retards).
+    """
+    names = list(data.columns)
+    k, p = len(names), maxlags
+    Z, Y = build_lagged_design(data, p)
+    lag_weights = np.repeat(np.arange(1, p + 1, dtype=float) ** lag_penalty, k)
+    alphas = penalty_grid(Z, Y, l1_ratio, lag_weights, n_alphas=n_alphas)
+
+    train_ends = range(max(len(Y) - n_folds, len(Y) // 2), len(Y))
+    # Threads : la descente de coordonnées libère le GIL et on évite le coût de lancement des processus
+    errors = np.array(Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(fold_errors)(Z, Y, train_end, alphas, l1_ratio, lag_weights)
+        for train_end in train_ends
+    ))  # (n_folds, n_alphas, k)
+    cv_mse = errors.mean(axis=0)
+    best = cv_mse.argmin(axis=0)
+    if penalty_rule == '1se':
+        cv_se = errors.std(axis=0, ddof=1) / np.sqrt(len(errors))
+        threshold = cv_mse[best, np.arange(k)] + cv_se[best, np.arange(k)]
+        # Les pénalités sont décroissantes : le premier indice sous le seuil est la plus forte
+        best = (cv_mse <= threshold).argmax(axis=0)
+    elif penalty_rule != 'min':
+        raise ValueError(f"penalty_rule doit valoir 'min' ou '1se', pas {penalty_rule!r}")
+
+    # Un seul chemin sur l'échantillon complet, puis la pénalité retenue pour chaque équation
+    path, converged = fit_penalty_path(Z, Y, alphas, l1_ratio, lag_weights)
+    if not converged.all():
+        warnings.warn(
+            f"Descente de coordonnées non convergée ({MAX_ITER} itérations) pour : "
+            f"{', '.join(name for name, ok in zip(names, converged) if not ok)}.",
+            RuntimeWarning
+        )
+    coefs = np.column_stack([path[best[j], :, j] for j in range(k)])
+
+    exog_names = ['const'] + [f"L{lag}.{name}" for lag in range(1, p + 1) for name in names]
+    params = pd.DataFrame(coefs, index=exog_names, columns=names)
+    exog = np.column_stack([np.ones(len(Z)), Z])
+    resid = pd.DataFrame(Y - exog @ coefs, index=data.index[p:], columns=names)
+    # Degrés de liberté du lasso, par équation : observations moins coefficients non nuls
+    df_resid = len(Y) - 1 - (coefs[1:] != 0).sum(axis=0)
+    saturated = [name for name, df in zip(names, df_resid) if df <= 0]
+    if saturated:
+        warnings.warn(
+            f"Équations sans degré de liberté résiduel (autant de coefficients non nuls que "
+            f"d'observations) : {', '.join(saturated)}. Leur variance résiduelle est sous-estimée.",
+            RuntimeWarning
+        )
+    df_resid = np.maximum(df_resid, 1)
+    sigma_u = pd.DataFrame(resid.values.T @ resid.values / np.sqrt(np.outer(df_resid, df_resid)),
+                           index=names, columns=names)
+
+    return SparseVARResults(
+        params=params,
+        resid=resid,
+        sigma_u=sigma_u,
+        k_ar=p,
+        alphas=pd.Series(alphas[np.arange(k), best], index=names),
+        l1_ratio=l1_ratio,
+        cv_mse=pd.Series(cv_mse[best, np.arange(k)], index=names),
+        exog=exog,
+        endog=Y,
+        lag_weights=lag_weights
+    )
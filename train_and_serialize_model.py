@@ -8,6 +8,8 @@ from statsmodels.stats.stattools import durbin_watson
 from statsmodels.stats.diagnostic import het_white
 from scipy.stats import shapiro
 import joblib
+from joblib import Parallel, delayed
+from sparse_var import fit_sparse_var
 import warnings
 
 warnings.filterwarnings('ignore', category=UserWarning)
@@ -38,7 +40,39 @@ for col in df_full.columns:
     if df_full[col].dtype == 'object':
         df_full[col] = pd.to_numeric(df_full[col].str.replace(',', '.'), errors='coerce')
         
-df_system = df_full[['PIB', 'Investissement', 'Balance commerciale']].copy().dropna()
+CORE_SERIES = ['PIB', 'Investissement', 'Balance commerciale']
+# Toute colonne supplémentaire du fichier (transferts de fonds, consommation publique,
+# termes de l'échange, inflation...) est ajoutée au système comme déterminant.
+EXTRA_DRIVERS = [col for col in df_full.columns if col not in CORE_SERIES]
+# Déterminants déjà exprimés en taux (%) : utilisés tels quels, sans calcul de croissance
+RATE_DRIVERS = ['Inflation']
+
+df_core = df_full[CORE_SERIES].dropna()
+# Un déterminant incomplet après sa première observation (trou au milieu de la série ou
+# dernières années absentes, fréquent dans les WDI) supprimerait des années de tout le
+# système : on l'écarte plutôt que de raccourcir l'échantillon ou de créer des trous.
+def has_gaps(series):
+    """Vrai si la série est vide ou a des valeurs manquantes après sa première observation."""
+    if series.isna().all():
+        return True
+    return series.loc[series.first_valid_index():].isna().any()
+
+missing_drivers = [col for col in EXTRA_DRIVERS if has_gaps(df_full.loc[df_core.index, col])]
+if missing_drivers:
+    print(f"⚠️ Déterminants écartés (valeurs manquantes) : {', '.join(missing_drivers)}")
+    EXTRA_DRIVERS = [col for col in EXTRA_DRIVERS if col not in missing_drivers]
+
+df_system = df_full[CORE_SERIES + EXTRA_DRIVERS].copy().dropna()
+if df_system.index[0] != df_core.index[0]:
+    print(f"⚠️ Les déterminants supplémentaires réduisent l'échantillon à {df_system.index[0]}-{df_system.index[-1]}.")
+
+# Les taux de croissance et les retards du VAR supposent des années consécutives :
+# en cas de trou, on ne garde que la plus longue période sans interruption.
+run_id = (df_system.index.to_series().diff() != 1).cumsum()
+if run_id.iloc[-1] > 1:
+    longest_run = run_id.value_counts().idxmax()
+    df_system = df_system[(run_id == longest_run).values]
+    print(f"⚠️ Années non consécutives : échantillon limité à {df_system.index[0]}-{df_system.index[-1]}.")
 
 # ==============================================================================
 # 2. CALCUL DES TAUX DE CROISSANCE
@@ -50,10 +84,20 @@ df_growth = pd.DataFrame(index=df_system.index)
 df_growth['Croissance_PIB'] = df_system['PIB'].pct_change() * 100
 df_growth['Croissance_Investissement'] = df_system['Investissement'].pct_change() * 100
 df_growth['Croissance_Balance_Comm'] = df_system['Balance commerciale'].pct_change() * 100
+for col in EXTRA_DRIVERS:
+    if col in RATE_DRIVERS:
+        df_growth[col] = df_system[col]
+    else:
+        df_growth[f'Croissance_{col}'] = df_system[col].pct_change() * 100
 
 df_growth.replace([np.inf, -np.inf], np.nan, inplace=True)
 df_growth.dropna(inplace=True)
 
+# Dernière année observée du système : point de départ de la reconstruction du PIB prédit
+last_year = df_growth.index[-1]
+if last_year != df_core.index[-1]:
+    print(f"⚠️ L'échantillon s'arrête en {last_year} au lieu de {df_core.index[-1]} : la prévision partira de {last_year}.")
+
 print("✅ Données transformées en taux de croissance.")
 
 # ==============================================================================
@@ -61,10 +105,20 @@ print("✅ Données transformées en taux de croissance.")
 # ==============================================================================
 print("\n--- Étape 3: Entraînement du Modèle VAR ---")
 
-model = VAR(df_growth)
-model_fit = model.fit(ic='aic', maxlags=3) 
+MAXLAGS = 3
+# Au-delà des trois séries de base, le VAR non contraint n'a plus assez de degrés de liberté :
+# on passe à l'estimateur elastic-net (pénalité choisie par validation croisée en parallèle).
+USE_SPARSE_VAR = len(df_growth.columns) > 3
+
+if USE_SPARSE_VAR:
+    model_fit = fit_sparse_var(df_growth, maxlags=MAXLAGS, l1_ratio=0.5, n_folds=12, n_jobs=-1)
+    print(f"✅ Modèle VAR régularisé entraîné avec succès ({len(df_growth.columns)} séries, p={model_fit.k_ar}, "
+          f"{model_fit.n_nonzero.sum()} coefficients non nuls).")
+else:
+    model = VAR(df_growth)
+    model_fit = model.fit(ic='aic', maxlags=MAXLAGS) 
 
-print(f"✅ Modèle VAR entraîné avec succès (lag optimal p={model_fit.k_ar}).")
+    print(f"✅ Modèle VAR entraîné avec succès (lag optimal p={model_fit.k_ar}).")
 
 # ==============================================================================
 # 4. DIAGNOSTIC DES RÉSIDUS (SECTION AJOUTÉE)
@@ -85,8 +139,9 @@ print("✅ Test de Shapiro-Wilk (Normalité) effectué.")
 try:
     # Le test de White compare les résidus aux variables exogènes du modèle.
     # Dans un VAR, les exogènes sont les lags des variables elles-mêmes.
+    # Le test porte sur l'équation du PIB, seule présentée dans l'application.
     exog_for_het_test = model_fit.model.exog
-    white_test_p_value = het_white(residuals, exog_for_het_test)[1]
+    white_test_p_value = het_white(residuals['Croissance_PIB'], exog_for_het_test)[1]
     print("✅ Test de White (Homoscédasticité) effectué.")
 except Exception as e:
     white_test_p_value = None # Le test peut échouer si l'échantillon est trop petit
@@ -100,15 +155,144 @@ diagnostics = {
 }
 
 # ==============================================================================
-# 5. SÉRIALISATION DU MODÈLE ET DES DONNÉES
+# 5. ANALYSE D'INFLUENCE (JACKKNIFE / LEAVE-ONE-YEAR-OUT)
+# ==============================================================================
+print("\n--- Étape 5: Analyse d'influence des années (Jackknife) ---")
+
+N_FORECAST = 5                 # Même horizon que l'application
+INFLUENCE_BLOCK_SIZES = [1, 3] # 1 = leave-one-year-out, >1 = blocs glissants d'années consécutives
+INFLUENCE_N_JOBS = -1          # Nombre de cœurs utilisés (convention joblib : -1 = tous, -2 = tous sauf un...)
+# Une réestimation MCO coûte quelques microsecondes : en dessous de ce nombre de blocs,
+# lancer un pool de threads coûte plus cher que le calcul en série.
+INFLUENCE_PARALLEL_MIN_BLOCKS = 1000
+
+def build_var_design(data, p):
+    """Construit la matrice des régresseurs [1, y(t-1), ..., y(t-p)] et la cible y(t), comme statsmodels."""
+    values = np.asarray(data, dtype=float)
+    Z = np.hstack([np.ones((len(values) - p, 1))] +
+                  [values[p - lag:len(values) - lag] for lag in range(1, p + 1)])
+    Y = values[p:]
+    return Z, Y
+
+def forecast_pib_level(coefs, last_lags, last_pib_level, steps):
+    """Prévision récursive des taux de croissance puis reconstruction du niveau final du PIB."""
+    p = len(last_lags)
+    history = [row for row in last_lags]
+    level = last_pib_level
+    for _ in range(steps):
+        regressors = np.concatenate([[1.0]] + [history[-lag] for lag in range(1, p + 1)])
+        growth = regressors @ coefs
+        history.append(growth)
+        level *= (1 + growth[0] / 100)  # La première colonne est la croissance du PIB
+    return level
+
+def refit_blocks(blocks, refit, last_lags, last_pib_level, steps):
+    """Réestime le VAR avec `refit(lignes exclues)` pour chaque bloc, puis prévoit le niveau du PIB."""
+    results = []
+    for rows in blocks:
+        try:
+            coefs = refit(rows)
+        except np.linalg.LinAlgError:
+            results.append(None)  # Bloc trop large : système singulier, seul ce bloc est ignoré
+            continue
+        results.append((coefs, forecast_pib_level(coefs, last_lags, last_pib_level, steps)))
+    return results
+
+p = model_fit.k_ar
+Z, Y = build_var_design(df_growth, p)
+last_lags = df_growth.values[-p:]
+last_pib_level = df_full.loc[last_year, 'PIB']
+
+full_coefs = np.asarray(model_fit.params, dtype=float)
+full_pib_forecast = forecast_pib_level(full_coefs, last_lags, last_pib_level, N_FORECAST)
+
+if USE_SPARSE_VAR:
+    # Elastic-net aux pénalités déjà retenues par équation, démarré à chaud sur les coefficients complets
+    refit = model_fit.refit_excluding
+else:
+    ZtZ, ZtY = Z.T @ Z, Z.T @ Y  # Calculés une seule fois, partagés par toutes les réestimations
+
+    def refit(rows):
+        """Retranche la contribution des lignes exclues aux produits croisés partagés."""
+        Z_b, Y_b = Z[rows], Y[rows]
+        return np.linalg.solve(ZtZ - Z_b.T @ Z_b, ZtY - Z_b.T @ Y_b)
+
+# La ligne r du système couvre les années df_growth[r .. r+p] (p retards puis la cible).
+# Exclure les années [start, start+size) retire donc toutes les lignes où elles figurent,
+# comme cible ou comme retard : r = start-p .. start+size-1. Les p premières années,
+# qui n'apparaissent que comme retards, sont ainsi évaluées elles aussi.
+blocks = [(df_growth.index[start:start + size], np.arange(max(start - p, 0), min(start + size, len(Y))))
+          for size in INFLUENCE_BLOCK_SIZES
+          for start in range(len(df_growth) - size + 1)]
+
+# Une réestimation elastic-net coûte une descente de coordonnées par équation : elle justifie le parallélisme
+if not USE_SPARSE_VAR and len(blocks) < INFLUENCE_PARALLEL_MIN_BLOCKS:
+    refits = refit_blocks([rows for _, rows in blocks], refit, last_lags, last_pib_level, N_FORECAST)
+else:
+    n_workers = min(len(blocks), joblib.effective_n_jobs(INFLUENCE_N_JOBS))
+    chunks = [[rows for _, rows in blocks[i::n_workers]] for i in range(n_workers)]
+    # Threads : np.linalg.solve et la descente de coordonnées libèrent le GIL, sans coût de lancement de processus
+    chunk_results = Parallel(n_jobs=n_workers, prefer='threads')(
+        delayed(refit_blocks)(chunk, refit, last_lags, last_pib_level, N_FORECAST)
+        for chunk in chunks
+    )
+    refits = [None] * len(blocks)
+    for i, chunk_result in enumerate(chunk_results):
+        refits[i::n_workers] = chunk_result
+
+influence_rows, coef_deltas = [], {}
+for (years, _), result in zip(blocks, refits):
+    if result is None:
+        continue
+    coefs, pib_forecast = result
+    label = f"{years[0]}" if len(years) == 1 else f"{years[0]}-{years[-1]}"
+    coef_deltas[label] = coefs - full_coefs
+    influence_rows.append({
+        'Années exclues': label,
+        'Taille du bloc': len(years),
+        'Variation des coefficients': np.linalg.norm(coefs - full_coefs),
+        'Variation relative des coefficients (%)': 100 * np.linalg.norm(coefs - full_coefs) / np.linalg.norm(full_coefs),
+        f'PIB prédit à {N_FORECAST} ans': pib_forecast,
+        'Variation du PIB prédit (%)': 100 * (pib_forecast / full_pib_forecast - 1),
+    })
+
+n_skipped = len(blocks) - len(influence_rows)
+if n_skipped:
+    print(f"⚠️ {n_skipped} bloc(s) ignoré(s) : système singulier après exclusion.")
+
+if influence_rows:
+    influence_df = pd.DataFrame(influence_rows)
+    influence_df = influence_df.reindex(
+        influence_df['Variation du PIB prédit (%)'].abs().sort_values(ascending=False).index
+    ).reset_index(drop=True)
+
+    influence = {
+        'table': influence_df,
+        'coef_deltas': coef_deltas,
+        'full_pib_forecast': full_pib_forecast,
+        'horizon': N_FORECAST,
+        'block_sizes': sorted(influence_df['Taille du bloc'].unique().tolist())
+    }
+    print(f"✅ {len(influence_rows)} réestimations effectuées.")
+    single_years = influence_df[influence_df['Taille du bloc'] == 1]
+    if not single_years.empty:
+        print(f"   Année la plus influente : {single_years['Années exclues'].iloc[0]}.")
+else:
+    influence = None
+    print("⚠️ L'analyse d'influence n'a pas pu être effectuée : tous les systèmes sont singuliers.")
+
+# ==============================================================================
+# 6. SÉRIALISATION DU MODÈLE ET DES DONNÉES
 # ==============================================================================
-print("\n--- Étape 5: Sérialisation des Artefacts ---")
+print("\n--- Étape 6: Sérialisation des Artefacts ---")
 
 bundle_for_app = {
     'model_fit': model_fit,
     'df_growth': df_growth,
     'df_full': df_full,
-    'diagnostics': diagnostics  # <-- ON AJOUTE LES DIAGNOSTICS AU BUNDLE
+    'last_year': last_year,
+    'diagnostics': diagnostics,  # <-- ON AJOUTE LES DIAGNOSTICS AU BUNDLE
+    'influence': influence
 }
 
 bundle_filename = 'growth_model_bundle.pkl'